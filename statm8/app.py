@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from statm8.endpoints import loader, generator
+from statm8.endpoints import loader, generator, runs
 
 app = FastAPI()
 
@@ -14,6 +14,7 @@ app.add_middleware(
 
 app.include_router(loader.router)
 app.include_router(generator.router)
+app.include_router(runs.router)
 
 @app.get("/")
 def root():
@@ -6,21 +6,14 @@ EDA_CODE_GENERATION_TEMPLATE = ChatPromptTemplate.from_messages([
 
 CRITICAL: Return ONLY pure Python code. DO NOT use markdown code fences (no ```python or ```).
 
-Given dataset information, generate Python code blocks for comprehensive EDA analysis. Each code block should:
+Given dataset information, generate Python code blocks for EDA analysis. Each code block should:
 1. Be self-contained and executable
 2. Use pandas, matplotlib, seaborn, and numpy
 3. Include proper error handling
 4. Save plots to the specified output directory
 5. Print meaningful insights
 
-Generate code for the following analyses:
-- Data overview and structure
-- Missing value analysis
-- Numerical feature distributions
-- Categorical feature distributions
-- Correlation analysis
-- Outlier detection
-- Feature relationships
+{analyses_section}
 
 Important: 
 - Use 'df' as the DataFrame variable name
@@ -44,11 +37,27 @@ Output Directory: {output_dir}
 
 {comments_section}
 
-Generate Python code blocks for comprehensive EDA. Return ONLY valid Python code blocks separated by '### BLOCK_SEPARATOR ###'.
+Generate Python code blocks for the analyses described above. Return ONLY valid Python code blocks separated by '### BLOCK_SEPARATOR ###'.
 Each block should start with a comment describing what it does.""")
 ])
 
 
+# Analyses requested from the LLM in EDA_CODE_GENERATION_TEMPLATE's analyses_section
+STANDARD_EDA_ANALYSES = """Generate code for the following analyses:
+- Data overview and structure
+- Missing value analysis
+- Numerical feature distributions
+- Categorical feature distributions
+- Correlation analysis
+- Outlier detection
+- Feature relationships"""
+
+CUSTOM_EDA_ANALYSES = """The standard analyses (data overview, missing values, numerical and categorical distributions,
+correlation analysis and IQR outlier detection) have already been computed. Generate code ONLY for
+the additional analyses requested in the user's comments.
+Do not save plots with file names starting with 'native_'; those are reserved for the standard analyses."""
+
+
 CODE_BLOCK_TEMPLATE = """
 # {description}
 import pandas as pd
@@ -66,4 +75,15 @@ df = pd.read_csv('{file_path}')
 output_dir = '{output_dir}'
 
 {code}
-"""
\ No newline at end of file
+"""
+
+
+# Native analyses are computed in-process instead of by LLM generated code
+NATIVE_CODE_PLACEHOLDER = "# Computed natively by statm8: {function}"
+NATIVE_PLOT_DPI = 150
+# Native plot file names start with this so LLM generated code cannot overwrite them
+NATIVE_PLOT_PREFIX = "native_"
+NATIVE_HISTOGRAM_BINS = 30
+NATIVE_TOP_CATEGORIES = 10
+NATIVE_MAX_PLOT_COLUMNS = 36
+NATIVE_TOP_CORRELATIONS = 10
@@ -5,6 +5,9 @@ load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 UPLOAD_FOLDER = "uploads"
+RUNS_DB_PATH = os.path.join("outputs", "runs.db")
+# String columns with at most this share of distinct values are stored as 'category'
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
 llm = ChatGroq(
     model="llama-3.1-8b-instant",
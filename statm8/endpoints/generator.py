@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from statm8.models.generator import GenerateEDARequest, GenerateEDAResponse, StreamCodeBlockResponse
 from statm8.services.generator import generate_and_execute_eda, generate_and_execute_eda_sync, get_output_dir_from_filepath
+from statm8.services.runs import create_run_id
 import json
 import os
 
@@ -17,7 +18,7 @@ async def generate_eda_stream(request: GenerateEDARequest, max_retries: int = 2)
     real-time feedback on the EDA process.
     
     Args:
-        request: Contains file_path and optional comments
+        request: Contains file_path, optional comments and whether to run standard analyses natively
         max_retries: Maximum number of regeneration attempts if code fails (default: 2)
     """
     if not os.path.exists(request.file_path):
@@ -26,15 +27,17 @@ async def generate_eda_stream(request: GenerateEDARequest, max_retries: int = 2)
     if not request.file_path.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
     
-    output_dir = get_output_dir_from_filepath(request.file_path)
+    run_id = create_run_id()
+    output_dir = get_output_dir_from_filepath(request.file_path, run_id)
     
     async def event_stream():
         try:
-            for result in generate_and_execute_eda(request.file_path, output_dir, request.comments, max_retries):
+            for result in generate_and_execute_eda(request.file_path, output_dir, request.comments, max_retries, run_id, request.native):
                 data = result.model_dump_json()
                 yield f"data: {data}\n\n"
         except Exception as e:
             error_response = StreamCodeBlockResponse(
+                run_id=run_id,
                 block_id=-1,
                 description="Error occurred",
                 code="",
@@ -63,7 +66,7 @@ async def generate_eda(request: GenerateEDARequest, max_retries: int = 2):
     the complete results in a single response.
     
     Args:
-        request: Contains file_path and optional comments
+        request: Contains file_path, optional comments and whether to run standard analyses natively
         max_retries: Maximum number of regeneration attempts if code fails (default: 2)
     """
     if not os.path.exists(request.file_path):
@@ -72,13 +75,14 @@ async def generate_eda(request: GenerateEDARequest, max_retries: int = 2):
     if not request.file_path.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
     
-    output_dir = get_output_dir_from_filepath(request.file_path)
+    run_id = create_run_id()
+    output_dir = get_output_dir_from_filepath(request.file_path, run_id)
     
     try:
-        result = generate_and_execute_eda_sync(request.file_path, output_dir, request.comments, max_retries)
+        result = generate_and_execute_eda_sync(request.file_path, output_dir, request.comments, max_retries, run_id, request.native)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating EDA: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating EDA (run {run_id}): {str(e)}")
 
 
 @router.get("/list-plots")
@@ -1,16 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from statm8.services.loader import analyze_file
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from statm8.services.loader import analyze_file, save_summary
 from statm8.models.loader import DatasetSummaryResponse
-from statm8.constants.stat import UPLOAD_FOLDER
-import os
-import json
 
 router = APIRouter(tags=["Data Loader"])
 
 @router.post("/load", response_model=DatasetSummaryResponse)
-async def analyze_dataset(file: UploadFile = File(...)):
+async def analyze_dataset(background_tasks: BackgroundTasks, file: UploadFile = File(...), compact: bool = True):
     """
     Upload a CSV or JSON file and get a comprehensive dataset summary
+
+    Args:
+        file: CSV or JSON file to analyze
+        compact: Hold the data with downcast numeric, categorical and Arrow-backed string dtypes (default: True).
+            Column dtype still reports the default dtype; the in-memory one is in compact_dtype.
     """
     if not file.filename.endswith(('.csv', '.json')):
         raise HTTPException(
@@ -20,13 +22,10 @@ async def analyze_dataset(file: UploadFile = File(...)):
     
     try:
         content = await file.read()
-        result = analyze_file(content, file.filename)
-
-        base_name = os.path.splitext(file.filename)[0]
-        output_path = os.path.join(UPLOAD_FOLDER, f"{base_name}.json")
+        result = analyze_file(content, file.filename, compact)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result.dict(), f, indent=2, ensure_ascii=False)
+        # Persist the summary after the response has been sent
+        background_tasks.add_task(save_summary, result, file.filename)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
\ No newline at end of file
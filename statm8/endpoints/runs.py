@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from statm8.models.runs import RunRecord, RunListResponse
+from statm8.services.runs import list_runs, count_runs, get_run
+
+router = APIRouter(tags=["EDA Runs"])
+
+
+@router.get("/runs", response_model=RunListResponse)
+async def list_eda_runs(dataset_hash: Optional[str] = None, file_path: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    """
+    List past EDA runs, newest first
+    
+    Args:
+        dataset_hash: Only return runs for the dataset with this SHA-256 hash
+        file_path: Only return runs for this file path, e.g. uploads/iris.csv
+        limit: Maximum number of runs to return, 1-500 (default: 50)
+    """
+    runs = list_runs(dataset_hash, file_path, limit)
+    return RunListResponse(total_runs=count_runs(dataset_hash, file_path), runs=runs)
+
+
+@router.get("/runs/{run_id}", response_model=RunRecord)
+async def get_eda_run(run_id: str):
+    """
+    Fetch a past EDA run with all of its blocks, outputs and plot references
+    """
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run not found: {run_id}")
+    return run
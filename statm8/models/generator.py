@@ -17,10 +17,12 @@ class GenerateEDARequest(BaseModel):
     """Request model for EDA generation"""
     file_path: str
     comments: Optional[str] = None  # User comments/instructions for EDA generation
+    native: bool = True  # Compute standard analyses natively, use the LLM only for comments
 
 
 class GenerateEDAResponse(BaseModel):
     """Response model for EDA generation"""
+    run_id: Optional[str] = None
     file_path: str
     output_dir: str
     total_blocks: int
@@ -30,6 +32,7 @@ class GenerateEDAResponse(BaseModel):
 
 class StreamCodeBlockResponse(BaseModel):
     """Streaming response for individual code blocks"""
+    run_id: Optional[str] = None
     block_id: int
     description: str
     code: str
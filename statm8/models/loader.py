@@ -1,9 +1,10 @@
 from pydantic import BaseModel
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class ColumnInfo(BaseModel):
     name: str
-    dtype: str
+    dtype: str  # dtype when loaded with defaults, as analysis code will see it
+    compact_dtype: Optional[str] = None  # dtype held in memory after compact loading
     non_null_count: int
     null_count: int
     unique_count: int
@@ -15,4 +16,6 @@ class DatasetSummaryResponse(BaseModel):
     total_columns: int
     columns_info: List[ColumnInfo]
     sample_rows: List[Dict[str, Any]]
-    ai_summary: str
\ No newline at end of file
+    ai_summary: str
+    memory_usage_before: int  # bytes, as loaded with default dtypes
+    memory_usage_after: int  # bytes, after compact dtype conversion
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from statm8.models.generator import CodeBlock
+
+class RunSummary(BaseModel):
+    """Index entry for a stored EDA run"""
+    run_id: str
+    dataset_hash: str
+    file_path: str
+    output_dir: str
+    overall_status: str
+    total_blocks: int
+    created_at: float  # Unix timestamp of when the run started
+    duration: float  # Seconds from start to the last executed block
+
+
+class RunRecord(RunSummary):
+    """Full stored EDA run including every executed block"""
+    comments: Optional[str] = None
+    error: Optional[str] = None  # Why the run aborted, if it did
+    blocks: List[CodeBlock]
+
+
+class RunListResponse(BaseModel):
+    """Response model for listing stored runs"""
+    total_runs: int  # All runs matching the filters, not just this page
+    runs: List[RunSummary]
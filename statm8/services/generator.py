@@ -10,21 +10,38 @@ from contextlib import redirect_stdout, redirect_stderr
 from typing import List, Dict, Any, Generator, Optional
 from statm8.models.generator import CodeBlock, GenerateEDAResponse, StreamCodeBlockResponse
 from statm8.constants.stat import llm
-from statm8.constants.generator import EDA_CODE_GENERATION_TEMPLATE
+from statm8.constants.generator import EDA_CODE_GENERATION_TEMPLATE, STANDARD_EDA_ANALYSES, CUSTOM_EDA_ANALYSES
+from statm8.services.loader import serialize_dataframe
+from statm8.services.runs import save_run, compute_dataset_hash
+from statm8.services.native import NATIVE_ANALYSES, load_native_context, execute_native_analysis
 
 
-def get_output_dir_from_filepath(file_path: str) -> str:
+def get_output_dir_from_filepath(file_path: str, run_id: Optional[str] = None) -> str:
     """
     Generate output directory path from input file path.
     Example: uploads/iris.csv -> outputs/plots/iris
+    With a run id each run gets its own directory so concurrent runs never overwrite each other.
+    Example: uploads/iris.csv, 3f2a... -> outputs/plots/iris/3f2a...
     """
     # Get the base name without extension
     base_name = os.path.splitext(os.path.basename(file_path))[0]
     # Create output directory path
     output_dir = os.path.join("outputs", "plots", base_name)
+    if run_id:
+        output_dir = os.path.join(output_dir, run_id)
     return output_dir
 
 
+def get_overall_status(blocks: List[CodeBlock]) -> str:
+    """Determine the overall status of a run from its executed blocks"""
+    if all(block.status == "success" for block in blocks):
+        return "completed"
+    elif any(block.status == "error" for block in blocks):
+        return "partial_success"
+    else:
+        return "failed"
+
+
 def clean_code(code: str) -> str:
     """Remove markdown code fences and clean up code"""
     # Remove markdown code fences
@@ -37,13 +54,19 @@ def clean_code(code: str) -> str:
 
 def get_dataset_info(file_path: str) -> Dict[str, Any]:
     """Extract dataset information for code generation"""
-    df = pd.read_csv(file_path)
-    
+    return get_dataframe_info(pd.read_csv(file_path))
+
+
+def get_dataframe_info(df: pd.DataFrame, dtypes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Extract dataset information for code generation from an already loaded DataFrame.
+    dtypes overrides the reported dtype per column, e.g. the defaults of a frame loaded with compact dtypes.
+    """
     columns_info = []
     for col in df.columns:
         col_info = {
             "name": col,
-            "dtype": str(df[col].dtype),
+            "dtype": dtypes[col] if dtypes else str(df[col].dtype),
             "non_null": int(df[col].notna().sum()),
             "null": int(df[col].isna().sum()),
             "unique": int(df[col].nunique())
@@ -54,7 +77,7 @@ def get_dataset_info(file_path: str) -> Dict[str, Any]:
             col_info["mean"] = float(df[col].mean())
         columns_info.append(col_info)
     
-    sample_rows = df.head(3).to_dict('records')
+    sample_rows = serialize_dataframe(df.head(3))
     
     return {
         "total_rows": len(df),
@@ -119,12 +142,33 @@ def generate_eda_code_blocks(file_path: str, output_dir: str, comments: Optional
     response = chain.invoke({
         "file_path": file_path,
         "output_dir": output_dir,
+        "analyses_section": STANDARD_EDA_ANALYSES,
         "comments_section": comments_section,
         **dataset_info
     })
     
-    # Parse the response into code blocks
-    raw_blocks = response.content.split("### BLOCK_SEPARATOR ###")
+    return parse_code_blocks(response.content, file_path, output_dir)
+
+
+def generate_custom_code_blocks(file_path: str, output_dir: str, comments: str, dataset_info: Dict[str, Any], start_id: int = 1) -> List[CodeBlock]:
+    """Generate code blocks using LLM for only the custom analyses requested in the comments"""
+    comments_section = f"User Comments/Instructions:\n{comments}"
+    
+    chain = EDA_CODE_GENERATION_TEMPLATE | llm
+    response = chain.invoke({
+        "file_path": file_path,
+        "output_dir": output_dir,
+        "analyses_section": CUSTOM_EDA_ANALYSES,
+        "comments_section": comments_section,
+        **dataset_info
+    })
+    
+    return parse_code_blocks(response.content, file_path, output_dir, start_id)
+
+
+def parse_code_blocks(content: str, file_path: str, output_dir: str, start_id: int = 1) -> List[CodeBlock]:
+    """Split an LLM response into code blocks numbered from start_id"""
+    raw_blocks = content.split("### BLOCK_SEPARATOR ###")
     
     code_blocks = []
     for idx, block_content in enumerate(raw_blocks):
@@ -162,7 +206,7 @@ output_dir = '{output_dir}'
 {code}"""
         
         code_blocks.append(CodeBlock(
-            id=idx + 1,
+            id=start_id + idx,
             description=description,
             code=code,
             status="pending"
@@ -249,70 +293,168 @@ def execute_code_block(code_block: CodeBlock, file_path: str, output_dir: str, m
                 return code_block
 
 
-def generate_and_execute_eda(file_path: str, output_dir: str, comments: Optional[str] = None, max_retries: int = 2) -> Generator[StreamCodeBlockResponse, None, None]:
-    """Generate and execute EDA code blocks, streaming results"""
+def to_stream_response(block: CodeBlock, run_id: Optional[str] = None) -> StreamCodeBlockResponse:
+    """Convert an executed code block to its streaming response"""
+    return StreamCodeBlockResponse(
+        run_id=run_id,
+        block_id=block.id,
+        description=block.description,
+        code=block.code,
+        status=block.status,
+        output=block.output,
+        error=block.error,
+        plots_generated=block.plots_generated
+    )
+
+
+def record_run(run_id: str, dataset_hash: str, file_path: str, output_dir: str, comments: Optional[str], blocks: List[CodeBlock], started_at: float, completed: bool, error: Optional[str] = None) -> str:
+    """
+    Store a run in the run history, including runs that raised or were abandoned by the client,
+    so that every returned run_id resolves. Returns the overall status.
+    """
+    if completed:
+        overall_status = get_overall_status(blocks)
+    else:
+        overall_status = "failed"
+        error = error or "Run aborted before completion"
+    save_run(run_id, dataset_hash, file_path, output_dir, comments, blocks, overall_status, started_at, error)
+    return overall_status
+
+
+def generate_and_execute_eda(file_path: str, output_dir: str, comments: Optional[str] = None, max_retries: int = 2, run_id: Optional[str] = None, native: bool = True) -> Generator[StreamCodeBlockResponse, None, None]:
+    """
+    Generate and execute EDA code blocks, streaming results.
+    With native=True the standard analyses are computed in-process and the LLM only
+    generates code for custom analyses requested in the comments.
+    Runs with a run_id are stored in the run history, even if they fail or the client disconnects.
+    """
     
     # Validate file exists
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    # Generate code blocks
-    yield StreamCodeBlockResponse(
-        block_id=0,
-        description="Generating EDA code blocks...",
-        code="",
-        status="generating"
-    )
-    
-    code_blocks = generate_eda_code_blocks(file_path, output_dir, comments)
+    started_at = time.time()
+    # Hash now: the uploaded file may be replaced while the run is in progress
+    dataset_hash = compute_dataset_hash(file_path) if run_id else None
+    executed_blocks = []
+    completed = False
+    error = None
     
-    # Execute each block and stream results
-    for block in code_blocks:
-        # Stream block before execution
-        yield StreamCodeBlockResponse(
-            block_id=block.id,
-            description=block.description,
-            code=block.code,
-            status="executing"
-        )
+    try:
+        if native:
+            yield StreamCodeBlockResponse(
+                run_id=run_id,
+                block_id=0,
+                description="Running native EDA analyses...",
+                code="",
+                status="generating"
+            )
+            
+            df, profile = load_native_context(file_path)
+            for block_id, (description, analysis) in enumerate(NATIVE_ANALYSES, start=1):
+                executed_block = execute_native_analysis(block_id, description, analysis, df, profile, output_dir)
+                executed_blocks.append(executed_block)
+                yield to_stream_response(executed_block, run_id)
+            # Build the custom analysis prompt from the loaded frame instead of reading the CSV again
+            dataset_info = get_dataframe_info(df, profile["source_dtypes"]) if comments else None
+            del df, profile
+            
+            code_blocks = []
+            if comments:
+                yield StreamCodeBlockResponse(
+                    run_id=run_id,
+                    block_id=0,
+                    description="Generating custom EDA code blocks...",
+                    code="",
+                    status="generating"
+                )
+                code_blocks = generate_custom_code_blocks(file_path, output_dir, comments, dataset_info, len(NATIVE_ANALYSES) + 1)
+        else:
+            # Generate code blocks
+            yield StreamCodeBlockResponse(
+                run_id=run_id,
+                block_id=0,
+                description="Generating EDA code blocks...",
+                code="",
+                status="generating"
+            )
+            
+            code_blocks = generate_eda_code_blocks(file_path, output_dir, comments)
         
-        # Execute block with retry logic
-        executed_block = execute_code_block(block, file_path, output_dir, max_retries)
+        # Execute each block and stream results
+        for block in code_blocks:
+            # Stream block before execution
+            yield StreamCodeBlockResponse(
+                run_id=run_id,
+                block_id=block.id,
+                description=block.description,
+                code=block.code,
+                status="executing"
+            )
+            
+            # Execute block with retry logic
+            executed_block = execute_code_block(block, file_path, output_dir, max_retries)
+            executed_blocks.append(executed_block)
+            
+            # Stream results after execution
+            yield to_stream_response(executed_block, run_id)
         
-        # Stream results after execution
-        yield StreamCodeBlockResponse(
-            block_id=executed_block.id,
-            description=executed_block.description,
-            code=executed_block.code,
-            status=executed_block.status,
-            output=executed_block.output,
-            error=executed_block.error,
-            plots_generated=executed_block.plots_generated
-        )
-
-
-def generate_and_execute_eda_sync(file_path: str, output_dir: str, comments: Optional[str] = None, max_retries: int = 2) -> GenerateEDAResponse:
-    """Generate and execute EDA code blocks synchronously"""
+        completed = True
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        # Also runs on GeneratorExit when the client disconnects mid-stream
+        if run_id:
+            record_run(run_id, dataset_hash, file_path, output_dir, comments, executed_blocks, started_at, completed, error)
+
+
+def generate_and_execute_eda_sync(file_path: str, output_dir: str, comments: Optional[str] = None, max_retries: int = 2, run_id: Optional[str] = None, native: bool = True) -> GenerateEDAResponse:
+    """
+    Generate and execute EDA code blocks synchronously.
+    With native=True the standard analyses are computed in-process and the LLM only
+    generates code for custom analyses requested in the comments.
+    Runs with a run_id are stored in the run history, even if they fail.
+    """
     
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    code_blocks = generate_eda_code_blocks(file_path, output_dir, comments)
-    
+    started_at = time.time()
+    # Hash now: the uploaded file may be replaced while the run is in progress
+    dataset_hash = compute_dataset_hash(file_path) if run_id else None
     executed_blocks = []
-    for block in code_blocks:
-        executed_block = execute_code_block(block, file_path, output_dir, max_retries)
-        executed_blocks.append(executed_block)
     
-    # Determine overall status
-    if all(block.status == "success" for block in executed_blocks):
-        overall_status = "completed"
-    elif any(block.status == "error" for block in executed_blocks):
-        overall_status = "partial_success"
+    try:
+        if native:
+            df, profile = load_native_context(file_path)
+            for block_id, (description, analysis) in enumerate(NATIVE_ANALYSES, start=1):
+                executed_blocks.append(execute_native_analysis(block_id, description, analysis, df, profile, output_dir))
+            # Build the custom analysis prompt from the loaded frame instead of reading the CSV again
+            dataset_info = get_dataframe_info(df, profile["source_dtypes"]) if comments else None
+            del df, profile
+            
+            code_blocks = []
+            if comments:
+                code_blocks = generate_custom_code_blocks(file_path, output_dir, comments, dataset_info, len(NATIVE_ANALYSES) + 1)
+        else:
+            code_blocks = generate_eda_code_blocks(file_path, output_dir, comments)
+        
+        for block in code_blocks:
+            executed_block = execute_code_block(block, file_path, output_dir, max_retries)
+            executed_blocks.append(executed_block)
+    except Exception as e:
+        if run_id:
+            record_run(run_id, dataset_hash, file_path, output_dir, comments, executed_blocks, started_at, False, str(e))
+        raise
+    
+    if run_id:
+        overall_status = record_run(run_id, dataset_hash, file_path, output_dir, comments, executed_blocks, started_at, True)
     else:
-        overall_status = "failed"
+        overall_status = get_overall_status(executed_blocks)
     
     return GenerateEDAResponse(
+        run_id=run_id,
         file_path=file_path,
         output_dir=output_dir,
         total_blocks=len(executed_blocks),
@@ -1,21 +1,78 @@
 import pandas as pd
+import numpy as np
 import json
 import os
 import tempfile
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from statm8.models.loader import DatasetSummaryResponse, ColumnInfo
-from statm8.constants.stat import llm, UPLOAD_FOLDER
+from statm8.constants.stat import llm, UPLOAD_FOLDER, CATEGORY_MAX_UNIQUE_RATIO
 from statm8.constants.loader import DATASET_SUMMARY_TEMPLATE
 
-def serialize_value(value: Any) -> Any:
-    """Convert numpy/pandas types to Python native types"""
-    if pd.isna(value):
-        return None
-    if isinstance(value, (pd.Timestamp, pd.Period)):
-        return str(value)
-    if hasattr(value, 'item'):
-        return value.item()
-    return value
+def serialize_series(series: pd.Series) -> List[Any]:
+    """Convert a whole column to Python native types, with missing values as None"""
+    missing = series.isna()
+    if (pd.api.types.is_datetime64_any_dtype(series)
+            or pd.api.types.is_timedelta64_dtype(series)
+            or isinstance(series.dtype, pd.PeriodDtype)):
+        series = series.astype(str)
+    return series.astype(object).where(~missing, None).tolist()
+
+def serialize_dataframe(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to records of Python native types, one column at a time"""
+    columns = [serialize_series(df[col]) for col in df.columns]
+    return [dict(zip(df.columns, row)) for row in zip(*columns)]
+
+def get_memory_usage(df: pd.DataFrame) -> int:
+    """Total memory held by the DataFrame in bytes, including string contents"""
+    return int(df.memory_usage(deep=True).sum())
+
+def get_string_dtype() -> Any:
+    """Arrow-backed string dtype when pyarrow is installed, object otherwise"""
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype("pyarrow")
+    except ImportError:
+        return object
+
+def compact_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert columns to the smallest dtype that holds their values without loss:
+    - integers are downcast to the narrowest (unsigned) integer type
+    - floats are downcast to float32 only when every value round-trips exactly
+    - low-cardinality strings become 'category', the rest Arrow-backed strings
+    Columns are converted one at a time so peak memory stays close to the input.
+    """
+    string_dtype = get_string_dtype()
+    total_rows = len(df)
+
+    for col in df.columns:
+        series = df[col]
+
+        if pd.api.types.is_bool_dtype(series):
+            continue
+
+        if pd.api.types.is_integer_dtype(series):
+            downcast = 'unsigned' if total_rows and series.min() >= 0 else 'integer'
+            df[col] = pd.to_numeric(series, downcast=downcast)
+        elif pd.api.types.is_float_dtype(series):
+            # Values beyond the float32 range can never round-trip, so skip the cast entirely
+            finite = series[np.isfinite(series)]
+            if not finite.empty and finite.abs().max() > np.finfo('float32').max:
+                continue
+            downcasted = series.astype('float32')
+            if downcasted.astype(series.dtype).equals(series):
+                df[col] = downcasted
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            # Mixed-type object columns cannot be stored as strings without changing values
+            if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+                continue
+            unique_count = series.nunique()
+            if total_rows and unique_count / total_rows <= CATEGORY_MAX_UNIQUE_RATIO:
+                df[col] = series.astype('category')
+            elif string_dtype is not object:
+                df[col] = series.astype(string_dtype)
+
+    return df
 
 def load_dataframe(file_path: str) -> tuple[pd.DataFrame, str]:
     """Load CSV or JSON file into pandas DataFrame"""
@@ -26,21 +83,27 @@ def load_dataframe(file_path: str) -> tuple[pd.DataFrame, str]:
     else:
         raise ValueError("Unsupported file type")
 
-def get_column_info(df: pd.DataFrame) -> List[ColumnInfo]:
-    """Extract detailed information about each column"""
+def get_column_info(df: pd.DataFrame, source_dtypes: Optional[Dict[str, str]] = None) -> List[ColumnInfo]:
+    """
+    Extract detailed information about each column.
+    With source_dtypes the frame holds compact dtypes: dtype reports the default dtype
+    and compact_dtype the one actually held in memory.
+    """
+    non_null_counts = df.notna().sum()
+    unique_counts = df.nunique()
     columns_info = []
     
     for col in df.columns:
-        unique_values = df[col].dropna().unique()
-        sample_values = [serialize_value(v) for v in unique_values[:5].tolist()]
+        unique_values = pd.Series(df[col].dropna().unique()[:5])
         
         col_info = ColumnInfo(
             name=col,
-            dtype=str(df[col].dtype),
-            non_null_count=int(df[col].notna().sum()),
-            null_count=int(df[col].isna().sum()),
-            unique_count=int(df[col].nunique()),
-            sample_values=sample_values
+            dtype=source_dtypes[col] if source_dtypes else str(df[col].dtype),
+            compact_dtype=str(df[col].dtype) if source_dtypes else None,
+            non_null_count=int(non_null_counts[col]),
+            null_count=len(df) - int(non_null_counts[col]),
+            unique_count=int(unique_counts[col]),
+            sample_values=serialize_series(unique_values)
         )
         columns_info.append(col_info)
     
@@ -48,14 +111,10 @@ def get_column_info(df: pd.DataFrame) -> List[ColumnInfo]:
 
 def get_sample_rows(df: pd.DataFrame, n: int = 5) -> List[Dict[str, Any]]:
     """Get the first n rows as list of dictionaries"""
-    sample_rows = []
-    for _, row in df.head(n).iterrows():
-        row_dict = {col: serialize_value(value) for col, value in row.items()}
-        sample_rows.append(row_dict)
-    return sample_rows
-
-def create_demographics(df: pd.DataFrame, file_type: str) -> str:
-    """Create textual summary of dataset demographics"""
+    return serialize_dataframe(df.head(n))
+
+def create_demographics(df: pd.DataFrame, file_type: str, source_dtypes: Optional[Dict[str, str]] = None) -> str:
+    """Create textual summary of dataset demographics, reporting source_dtypes when given"""
     demographics = f"""
 Dataset Overview:
 - Total Rows: {len(df)}
@@ -66,7 +125,7 @@ Column Details:
 """
     for col in df.columns:
         demographics += f"\n{col}:"
-        demographics += f"\n  - Type: {df[col].dtype}"
+        demographics += f"\n  - Type: {source_dtypes[col] if source_dtypes else df[col].dtype}"
         demographics += f"\n  - Non-null: {df[col].notna().sum()}"
         demographics += f"\n  - Null: {df[col].isna().sum()}"
         demographics += f"\n  - Unique values: {df[col].nunique()}"
@@ -96,17 +155,32 @@ def save_file_to_folder(content: bytes, filename: str) -> str:
         f.write(content)
     return file_path
 
-def analyze_file(content: bytes, filename: str) -> DatasetSummaryResponse:
+def save_summary(summary: DatasetSummaryResponse, filename: str) -> str:
+    """Persist a dataset summary as compact JSON next to the uploaded file"""
+    base_name = os.path.splitext(filename)[0]
+    output_path = os.path.join(UPLOAD_FOLDER, f"{base_name}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(summary.model_dump_json())
+    return output_path
+
+def analyze_file(content: bytes, filename: str, compact: bool = True) -> DatasetSummaryResponse:
     """Complete dataset analysis pipeline"""
 
     file_path = save_file_to_folder(content, filename)
     
     # Load dataframe
     df, file_type = load_dataframe(file_path)
+    memory_usage_before = get_memory_usage(df)
+    # Analysis code reads the file with default dtypes, so those stay the reported dtypes
+    source_dtypes = None
+    if compact:
+        source_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        df = compact_dataframe(df)
+    memory_usage_after = get_memory_usage(df)
 
-    columns_info = get_column_info(df)
+    columns_info = get_column_info(df, source_dtypes)
     sample_rows = get_sample_rows(df, 5)
-    demographics = create_demographics(df, file_type)
+    demographics = create_demographics(df, file_type, source_dtypes)
     
     ai_summary = generate_ai_summary(demographics, sample_rows)
     
@@ -116,7 +190,9 @@ def analyze_file(content: bytes, filename: str) -> DatasetSummaryResponse:
         total_columns=len(df.columns),
         columns_info=columns_info,
         sample_rows=sample_rows,
-        ai_summary=ai_summary
+        ai_summary=ai_summary,
+        memory_usage_before=memory_usage_before,
+        memory_usage_after=memory_usage_after
     )
     
     return response
\ No newline at end of file
@@ -0,0 +1,327 @@
+import os
+import math
+import time
+import traceback
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from typing import List, Dict, Any, Tuple, Callable
+from statm8.models.generator import CodeBlock
+from statm8.services.loader import load_dataframe, compact_dataframe, get_memory_usage
+from statm8.constants.generator import (
+    NATIVE_CODE_PLACEHOLDER,
+    NATIVE_PLOT_DPI,
+    NATIVE_PLOT_PREFIX,
+    NATIVE_HISTOGRAM_BINS,
+    NATIVE_TOP_CATEGORIES,
+    NATIVE_MAX_PLOT_COLUMNS,
+    NATIVE_TOP_CORRELATIONS,
+)
+
+
+def build_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """Compute the column profile shared by every native analysis"""
+    non_null_counts = df.notna().sum()
+    candidate_columns = [
+        col for col in df.columns
+        if pd.api.types.is_numeric_dtype(df[col])
+        and not pd.api.types.is_bool_dtype(df[col])
+    ]
+    categorical_columns = [
+        col for col in df.columns
+        if col not in candidate_columns and non_null_counts[col] > 0
+        and not pd.api.types.is_datetime64_any_dtype(df[col])
+    ]
+
+    # Statistics only use finite values, so ±inf is treated like a missing value
+    values = df[candidate_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = np.isfinite(values)
+    has_values = finite.any(axis=0)
+    numeric_columns = [col for col, keep in zip(candidate_columns, has_values) if keep]
+    infinite_counts = pd.Series(np.isinf(values).sum(axis=0), index=candidate_columns)[numeric_columns]
+    values = np.where(finite, values, np.nan)[:, has_values]
+
+    return {
+        "total_rows": len(df),
+        "total_columns": len(df.columns),
+        "memory_usage": get_memory_usage(df),
+        "null_counts": len(df) - non_null_counts,
+        "unique_counts": df.nunique(),
+        "numeric_columns": numeric_columns,
+        "categorical_columns": categorical_columns,
+        "infinite_counts": infinite_counts,
+        # Float matrix of all numeric columns, NaN for missing and non-finite values
+        "numeric_values": values,
+        # Rows are the 25%, 50% and 75% quantiles of each numeric column
+        "quartiles": np.nanquantile(values, [0.25, 0.5, 0.75], axis=0),
+    }
+
+
+def load_native_context(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read the dataset once with compact dtypes and profile it"""
+    df, _ = load_dataframe(file_path)
+    # Generated code reads the CSV with default dtypes, so keep those for the LLM prompt
+    source_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    df = compact_dataframe(df)
+    profile = build_profile(df)
+    profile["source_dtypes"] = source_dtypes
+    return df, profile
+
+
+def batched_histograms(values: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram every column of a 2D array in a single bincount.
+    Returns counts of shape (columns, bins) and edges of shape (columns, bins + 1).
+    """
+    n_columns = values.shape[1]
+    # Only finite values are binned; columns without any get an empty histogram on [0, 1]
+    valid = np.isfinite(values)
+    has_values = valid.any(axis=0)
+    mins = np.min(values, axis=0, initial=np.inf, where=valid)
+    maxs = np.max(values, axis=0, initial=-np.inf, where=valid)
+    mins = np.where(has_values, mins, 0.0)
+    # Constant columns get a unit-wide range
+    constant = ~(maxs > mins)
+    maxs = np.where(constant, mins + 1.0, maxs)
+    # Halved so the span of extreme finite values cannot overflow to inf
+    half_spans = np.where(constant, 0.5, maxs / 2 - mins / 2)
+
+    positions = np.floor((np.where(valid, values, mins) / 2 - mins / 2) / half_spans * bins)
+    bin_index = np.clip(positions, 0, bins - 1)
+    # Offset each column into its own range of bins so one bincount covers all columns
+    flat_index = (bin_index + np.arange(n_columns) * bins)[valid].astype(np.int64)
+    counts = np.bincount(flat_index, minlength=n_columns * bins).reshape(n_columns, bins)
+
+    steps = np.linspace(0, 1, bins + 1)
+    edges = mins[:, None] * (1 - steps) + maxs[:, None] * steps
+    return counts, edges
+
+
+def create_grid_figure(n_plots: int, cell_size: Tuple[float, float] = (4, 3)) -> Tuple[Figure, np.ndarray]:
+    """Create a figure with a roughly square grid of axes, hiding the unused ones"""
+    n_cols = min(n_plots, 6)
+    n_rows = math.ceil(n_plots / n_cols)
+    fig = Figure(figsize=(cell_size[0] * n_cols, cell_size[1] * n_rows))
+    axes = fig.subplots(n_rows, n_cols, squeeze=False).ravel()
+    for ax in axes[n_plots:]:
+        ax.set_visible(False)
+    return fig, axes
+
+
+def save_figure(fig: Figure, output_dir: str, filename: str) -> str:
+    """Save a figure to the output directory under the reserved native prefix and return the plot filename"""
+    filename = f"{NATIVE_PLOT_PREFIX}{filename}"
+    fig.tight_layout()
+    fig.savefig(os.path.join(output_dir, filename), bbox_inches='tight', dpi=NATIVE_PLOT_DPI)
+    return filename
+
+
+def analyze_overview(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Shape, dtypes and memory footprint"""
+    dtypes = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "non_null": profile["total_rows"] - profile["null_counts"],
+        "unique": profile["unique_counts"],
+    })
+    output = (
+        f"Rows: {profile['total_rows']}\n"
+        f"Columns: {profile['total_columns']}\n"
+        f"Numerical columns: {len(profile['numeric_columns'])}\n"
+        f"Categorical columns: {len(profile['categorical_columns'])}\n"
+        f"Memory usage: {profile['memory_usage'] / 1024:.1f} KB\n\n"
+        f"{dtypes.to_string()}\n"
+    )
+    return output, []
+
+
+def analyze_missing_values(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Missing value counts and percentages per column"""
+    null_counts = profile["null_counts"]
+    missing = null_counts[null_counts > 0].sort_values(ascending=False)
+    if missing.empty:
+        return "No missing values found.\n", []
+
+    table = pd.DataFrame({
+        "missing": missing,
+        "percent": (missing / profile["total_rows"] * 100).round(2),
+    })
+
+    fig = Figure(figsize=(max(6, 0.4 * len(missing)), 4))
+    ax = fig.subplots()
+    ax.bar(table.index.astype(str), table["percent"])
+    ax.set_ylabel("Missing (%)")
+    ax.set_title("Missing Values by Column")
+    ax.tick_params(axis='x', labelrotation=90)
+    plot = save_figure(fig, output_dir, "missing_values.png")
+
+    output = f"Columns with missing values: {len(missing)}\n\n{table.to_string()}\n"
+    return output, [plot]
+
+
+def analyze_numerical_distributions(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Summary statistics and histograms of numerical columns"""
+    columns = profile["numeric_columns"]
+    if not columns:
+        return "No numerical columns found.\n", []
+
+    values = profile["numeric_values"]
+    quantiles = profile["quartiles"]
+    stats = pd.DataFrame({
+        "mean": np.nanmean(values, axis=0),
+        "std": np.nanstd(values, axis=0, ddof=1) if len(values) > 1 else np.nan,
+        "min": np.nanmin(values, axis=0),
+        "25%": quantiles[0],
+        "50%": quantiles[1],
+        "75%": quantiles[2],
+        "max": np.nanmax(values, axis=0),
+        "skew": pd.DataFrame(values, columns=columns).skew(),
+    }, index=columns)
+    if profile["infinite_counts"].any():
+        stats["infinite"] = profile["infinite_counts"]
+
+    plotted = columns[:NATIVE_MAX_PLOT_COLUMNS]
+    counts, edges = batched_histograms(values[:, :len(plotted)], NATIVE_HISTOGRAM_BINS)
+    fig, axes = create_grid_figure(len(plotted))
+    for ax, col, col_counts, col_edges in zip(axes, plotted, counts, edges):
+        ax.stairs(col_counts, col_edges, fill=True)
+        ax.set_title(str(col), fontsize=9)
+    plot = save_figure(fig, output_dir, "numerical_distributions.png")
+
+    output = f"{stats.round(4).to_string()}\n"
+    if len(plotted) < len(columns):
+        output += f"\nPlotted the first {len(plotted)} of {len(columns)} numerical columns.\n"
+    return output, [plot]
+
+
+def analyze_categorical_distributions(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Most frequent values of categorical columns"""
+    columns = profile["categorical_columns"]
+    if not columns:
+        return "No categorical columns found.\n", []
+
+    output = ""
+    top_values = {}
+    for col in columns:
+        counts = df[col].value_counts().head(NATIVE_TOP_CATEGORIES)
+        top_values[col] = counts
+        output += f"{col} ({profile['unique_counts'][col]} unique):\n{counts.to_string()}\n\n"
+
+    plotted = columns[:NATIVE_MAX_PLOT_COLUMNS]
+    fig, axes = create_grid_figure(len(plotted), cell_size=(5, 4))
+    for ax, col in zip(axes, plotted):
+        counts = top_values[col]
+        ax.barh(counts.index.astype(str)[::-1], counts.to_numpy()[::-1])
+        ax.set_title(str(col), fontsize=9)
+    plot = save_figure(fig, output_dir, "categorical_distributions.png")
+
+    return output, [plot]
+
+
+def analyze_correlations(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Pearson correlation matrix and the most strongly correlated pairs"""
+    columns = profile["numeric_columns"]
+    if len(columns) < 2:
+        return "At least two numerical columns are needed for correlation analysis.\n", []
+
+    matrix = pd.DataFrame(profile["numeric_values"], columns=columns).corr().to_numpy()
+
+    rows, cols = np.triu_indices(len(columns), k=1)
+    pair_values = matrix[rows, cols]
+    order = np.argsort(-np.nan_to_num(np.abs(pair_values), nan=-1))[:NATIVE_TOP_CORRELATIONS]
+    top_pairs = pd.DataFrame({
+        "feature_1": [columns[i] for i in rows[order]],
+        "feature_2": [columns[i] for i in cols[order]],
+        "correlation": pair_values[order].round(4),
+    })
+
+    size = max(6, 0.35 * len(columns))
+    fig = Figure(figsize=(size + 1, size))
+    ax = fig.subplots()
+    image = ax.imshow(matrix, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(columns)), [str(col) for col in columns], rotation=90, fontsize=8)
+    ax.set_yticks(range(len(columns)), [str(col) for col in columns], fontsize=8)
+    ax.set_title("Correlation Matrix")
+    fig.colorbar(image, ax=ax)
+    plot = save_figure(fig, output_dir, "correlation_matrix.png")
+
+    output = f"Most strongly correlated pairs:\n{top_pairs.to_string(index=False)}\n"
+    return output, [plot]
+
+
+def analyze_outliers(df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> Tuple[str, List[str]]:
+    """Outlier counts per numerical column using the 1.5 * IQR rule"""
+    columns = profile["numeric_columns"]
+    if not columns:
+        return "No numerical columns found.\n", []
+
+    values = profile["numeric_values"]
+    q1, median, q3 = profile["quartiles"]
+    iqr = q3 - q1
+    lower = q1 - 1.5 * iqr
+    upper = q3 + 1.5 * iqr
+    outliers = (values < lower) | (values > upper)
+    outlier_counts = outliers.sum(axis=0)
+    # Whiskers reach the most extreme values still inside the bounds
+    whisker_low = np.nanmin(np.where(outliers, np.nan, values), axis=0)
+    whisker_high = np.nanmax(np.where(outliers, np.nan, values), axis=0)
+
+    table = pd.DataFrame({
+        "lower_bound": lower,
+        "upper_bound": upper,
+        "outliers": outlier_counts,
+        "percent": (outlier_counts / profile["total_rows"] * 100).round(2),
+    }, index=columns).sort_values("outliers", ascending=False)
+
+    plotted = columns[:NATIVE_MAX_PLOT_COLUMNS]
+    fig, axes = create_grid_figure(len(plotted), cell_size=(3, 3))
+    for idx, (ax, col) in enumerate(zip(axes, plotted)):
+        # Draw from the precomputed statistics instead of letting matplotlib recompute them
+        ax.bxp([{
+            "med": median[idx],
+            "q1": q1[idx],
+            "q3": q3[idx],
+            "whislo": whisker_low[idx],
+            "whishi": whisker_high[idx],
+            "fliers": values[outliers[:, idx], idx],
+        }])
+        ax.set_title(str(col), fontsize=9)
+        ax.set_xticks([])
+    plot = save_figure(fig, output_dir, "outliers_boxplots.png")
+
+    output = f"Total outlier values: {int(outlier_counts.sum())}\n\n{table.round(4).to_string()}\n"
+    return output, [plot]
+
+
+NATIVE_ANALYSES: List[Tuple[str, Callable[[pd.DataFrame, Dict[str, Any], str], Tuple[str, List[str]]]]] = [
+    ("Data overview and structure", analyze_overview),
+    ("Missing value analysis", analyze_missing_values),
+    ("Numerical feature distributions", analyze_numerical_distributions),
+    ("Categorical feature distributions", analyze_categorical_distributions),
+    ("Correlation analysis", analyze_correlations),
+    ("Outlier detection (IQR)", analyze_outliers),
+]
+
+
+def execute_native_analysis(block_id: int, description: str, analysis: Callable, df: pd.DataFrame, profile: Dict[str, Any], output_dir: str) -> CodeBlock:
+    """Run a single native analysis and report it as an executed code block"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    code_block = CodeBlock(
+        id=block_id,
+        description=description,
+        code=NATIVE_CODE_PLACEHOLDER.format(function=analysis.__name__),
+        status="executing"
+    )
+
+    start_time = time.time()
+    try:
+        output, plots = analysis(df, profile, output_dir)
+        code_block.status = "success"
+        code_block.output = output
+        code_block.plots_generated = plots
+    except Exception as e:
+        code_block.status = "error"
+        code_block.error = f"{str(e)}\n\n{traceback.format_exc()}"
+    code_block.execution_time = round(time.time() - start_time, 2)
+
+    return code_block
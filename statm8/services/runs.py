@@ -0,0 +1,145 @@
+import os
+import time
+import uuid
+import sqlite3
+import hashlib
+from contextlib import closing
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from pydantic import TypeAdapter
+from statm8.models.generator import CodeBlock
+from statm8.models.runs import RunSummary, RunRecord
+from statm8.constants.stat import RUNS_DB_PATH
+
+BLOCKS_ADAPTER = TypeAdapter(List[CodeBlock])
+
+SUMMARY_COLUMNS = "run_id, dataset_hash, file_path, output_dir, overall_status, total_blocks, created_at, duration"
+
+
+@lru_cache(maxsize=None)
+def init_run_store() -> None:
+    """Create the run store schema once per process"""
+    os.makedirs(os.path.dirname(RUNS_DB_PATH), exist_ok=True)
+    with closing(sqlite3.connect(RUNS_DB_PATH)) as conn:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                dataset_hash TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                comments TEXT,
+                overall_status TEXT NOT NULL,
+                total_blocks INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                duration REAL NOT NULL,
+                error TEXT,
+                blocks TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_dataset_created ON runs (dataset_hash, created_at);
+            CREATE INDEX IF NOT EXISTS idx_runs_file_created ON runs (file_path, created_at);
+            CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+        """)
+
+
+def get_connection() -> sqlite3.Connection:
+    """Open the run store"""
+    init_run_store()
+    conn = sqlite3.connect(RUNS_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def create_run_id() -> str:
+    """Generate a unique identifier for a new run"""
+    return uuid.uuid4().hex
+
+
+def compute_dataset_hash(file_path: str) -> str:
+    """SHA-256 of the dataset file contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_run(run_id: str, dataset_hash: str, file_path: str, output_dir: str, comments: Optional[str], blocks: List[CodeBlock], overall_status: str, created_at: float, error: Optional[str] = None) -> RunSummary:
+    """
+    Store a finished or aborted run with its blocks, outputs, timings and plot references.
+    dataset_hash must be taken when the run starts, since the uploaded file can be replaced mid-run.
+    """
+    summary = RunSummary(
+        run_id=run_id,
+        dataset_hash=dataset_hash,
+        file_path=file_path,
+        output_dir=output_dir,
+        overall_status=overall_status,
+        total_blocks=len(blocks),
+        created_at=created_at,
+        duration=round(time.time() - created_at, 2)
+    )
+    with closing(get_connection()) as conn, conn:
+        conn.execute(
+            f"INSERT OR REPLACE INTO runs ({SUMMARY_COLUMNS}, comments, error, blocks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                summary.run_id,
+                summary.dataset_hash,
+                summary.file_path,
+                summary.output_dir,
+                summary.overall_status,
+                summary.total_blocks,
+                summary.created_at,
+                summary.duration,
+                comments,
+                error,
+                BLOCKS_ADAPTER.dump_json(blocks).decode("utf-8")
+            )
+        )
+    return summary
+
+
+def build_run_filters(dataset_hash: Optional[str] = None, file_path: Optional[str] = None) -> Tuple[str, tuple]:
+    """WHERE clause and parameters shared by run listing and counting"""
+    conditions = []
+    params: tuple = ()
+    if dataset_hash:
+        conditions.append("dataset_hash = ?")
+        params += (dataset_hash,)
+    if file_path:
+        conditions.append("file_path = ?")
+        params += (file_path,)
+    if not conditions:
+        return "", params
+    return " WHERE " + " AND ".join(conditions), params
+
+
+def list_runs(dataset_hash: Optional[str] = None, file_path: Optional[str] = None, limit: int = 50) -> List[RunSummary]:
+    """List stored runs, newest first, optionally for a single dataset hash and/or file path"""
+    where, params = build_run_filters(dataset_hash, file_path)
+    query = f"SELECT {SUMMARY_COLUMNS} FROM runs{where} ORDER BY created_at DESC LIMIT ?"
+
+    with closing(get_connection()) as conn:
+        rows = conn.execute(query, params + (limit,)).fetchall()
+    return [RunSummary(**dict(row)) for row in rows]
+
+
+def count_runs(dataset_hash: Optional[str] = None, file_path: Optional[str] = None) -> int:
+    """Count stored runs matching the same filters as list_runs"""
+    where, params = build_run_filters(dataset_hash, file_path)
+    with closing(get_connection()) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+
+def get_run(run_id: str) -> Optional[RunRecord]:
+    """Fetch a stored run by id, or None if it does not exist"""
+    with closing(get_connection()) as conn:
+        row = conn.execute(
+            f"SELECT {SUMMARY_COLUMNS}, comments, error, blocks FROM runs WHERE run_id = ?",
+            (run_id,)
+        ).fetchone()
+    if row is None:
+        return None
+
+    record = dict(row)
+    record["blocks"] = BLOCKS_ADAPTER.validate_json(record["blocks"])
+    return RunRecord(**record)